@@ -0,0 +1,372 @@
+"""
+Offline benchmark suite for the hot paths of every design module.
+
+benchmarks:
+ - food_ordering.place_order: OrderProcessingFacade.place_order
+ - shipping_cart.rule_chains: DiscountRuleChain.apply_discounts + ShippingRuleChain.get_best_shipping_offer
+ - jira.delayed_tasks: SprintManager.print_delayed_task over many sprints
+ - jira.user_tasks: SprintManager.print_user_tasks over many sprints
+ - doc_service.notify_observers: Document.notify_observers fan-out to many observers
+ - cricbuzz.play_match: Scoreboard.play_match for a full 20 over innings
+
+Every benchmark gets one untimed warmup pass, then --repeat timed passes that each record wall time and
+per-call latency percentiles. The passes run in rounds across the benchmarks and the result keeps the minimum
+of every timing metric (the pass least disturbed by the rest of the machine), so compare gates on a stable
+value rather than a single sample. The calls are then repeated once under tracemalloc and, with --profile-dir,
+under cProfile (one .prof per benchmark). Anything the modules print is sent to /dev/null while measuring.
+
+tracemalloc fields:
+ - alloc_peak_bytes: highest traced memory during the run
+ - call_alloc_p50_bytes / call_alloc_max_bytes: how far memory rose above its starting point inside a single
+   call, ie. the transient allocations one call makes, even if they are freed before it returns
+ - retained_blocks / retained_bytes: blocks (and their size) still allocated after the run that were not there
+   before it; this is what a call leaves behind, not how many allocations it made
+
+usage:
+    python benchmarks/bench.py run --output results.json [--scale 1.0] [--repeat 5] [--only cricbuzz] [--profile-dir profiles]
+    python benchmarks/bench.py compare baseline.json results.json [--threshold 0.10]
+
+compare exits with status 1 when any benchmark's p50 or wall time got slower by more than the threshold.
+"""
+
+import argparse
+import contextlib
+import cProfile
+import importlib.util
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BENCHMARKS = {}
+_modules = {}
+
+
+def load(relative_path):
+    # the design folders are not packages, so each module is loaded from its file
+    if relative_path not in _modules:
+        path = os.path.join(ROOT, relative_path)
+        name = "bench_" + os.path.splitext(os.path.basename(path))[0]
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _modules[relative_path] = module
+
+    return _modules[relative_path]
+
+
+def scaled(calls, scale):
+    # never 0, a benchmark with no calls has no latencies to report
+    return max(1, int(calls * scale))
+
+
+def benchmark(name):
+    # a benchmark is a setup(scale) returning (number of calls, call(i))
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+@benchmark("food_ordering.place_order")
+def place_order(scale):
+    app = load("design_food_ordering_app/food_ordering_app.py")
+    owner = app.UserFactory.create_user("RestaurantOwner", "Owner")
+    restaurant = app.Restaurant("Bench Palace", owner)
+    for i in range(50):
+        restaurant.add_menu_item(app.FoodItem(f"Item {i}", 10 + i))
+
+    rng = random.Random(1)
+    calls = scaled(20000, scale)
+    customers = [app.UserFactory.create_user("Customer", f"Customer {i}") for i in range(100)]
+    orders = [(customers[i % 100], rng.sample(restaurant.menu, 5)) for i in range(calls)]
+    facade = app.OrderProcessingFacade()
+    payment = app.UPIPayment()
+
+    def call(i):
+        customer, items = orders[i]
+        facade.place_order(customer, restaurant, items, payment)
+
+    return calls, call
+
+
+@benchmark("shipping_cart.rule_chains")
+def rule_chains(scale):
+    cart = load("design_shipping_cart/shipping_cart.py")
+    shipping_rule_chain = cart.ShippingRuleChain()
+    for rule in (cart.Free2HourGroceryPrime(), cart.Free1DayShipping(), cart.Free2DayShippingPrime(),
+                 cart.Free2DayShippingNonPrime()):
+        shipping_rule_chain.add_rule(rule)
+    discount_rule_chain = cart.DiscountRuleChain()
+    discount_rule_chain.add_rule(cart.SubscribeAndSaveDiscount())
+
+    # discounts change item prices in place, so every call gets its own order
+    rng = random.Random(2)
+    calls = scaled(50000, scale)
+    orders = []
+    for _ in range(calls):
+        items = [cart.Item(f"Item {j}", rng.randint(1, 60), is_subscribe_and_save=rng.random() < 0.3,
+                           is_grocery=rng.random() < 0.3) for j in range(rng.randint(1, 8))]
+        orders.append(cart.Order(cart.Customer(is_prime=rng.random() < 0.5), items))
+
+    def call(i):
+        discount_rule_chain.apply_discounts(orders[i])
+        shipping_rule_chain.get_best_shipping_offer(orders[i])
+
+    return calls, call
+
+
+def sprint_manager():
+    jira = load("design_jira/jira.py")
+    manager = jira.SprintManager()
+    manager.sprints.clear()
+
+    rng = random.Random(3)
+    assignees = [f"User {i}" for i in range(20)]
+    for s in range(50):
+        sprint = manager.create_sprint(f"Sprint {s}")
+        for t in range(100):
+            task = jira.TaskFactory.create_task(rng.choice(["Story", "Feature", "Bug"]), f"Task {s}-{t}",
+                                                rng.choice(assignees))
+            task.status = rng.choice(list(jira.TaskStatus))
+            sprint.add_task(task)
+
+    return manager, assignees
+
+
+@benchmark("jira.delayed_tasks")
+def delayed_tasks(scale):
+    manager, _ = sprint_manager()
+    calls = scaled(200, scale)
+
+    def call(i):
+        manager.print_delayed_task()
+
+    return calls, call
+
+
+@benchmark("jira.user_tasks")
+def user_tasks(scale):
+    manager, assignees = sprint_manager()
+    calls = scaled(200, scale)
+
+    def call(i):
+        manager.print_user_tasks(assignees[i % len(assignees)])
+
+    return calls, call
+
+
+@benchmark("doc_service.notify_observers")
+def notify_observers(scale):
+    doc_service = load("design_doc_service/doc_service.py")
+
+    class QuietViewer(doc_service.Viewer):
+        def update(self, message):
+            self.last_message = message
+
+    document = doc_service.Document("bench_doc", "")
+    for i in range(1000):
+        document.register_observer(QuietViewer(f"Viewer {i}"))
+
+    calls = scaled(5000, scale)
+
+    def call(i):
+        document.notify_observers(f"Viewer {i} added")
+
+    return calls, call
+
+
+@benchmark("cricbuzz.play_match")
+def play_match(scale):
+    cricbuzz = load("design_cricbuzz/cricbuzz.py")
+    rng = random.Random(4)
+    players = [f"P{i}" for i in range(11)]
+    choices = ["0", "1", "2", "3", "4", "6", "Wd", "Nb"]
+    calls = scaled(2000, scale)
+
+    def full_innings():
+        # no wickets, and wides / no-balls are re-bowled, so balls are drawn until 120 legal ones make 20 overs
+        balls, legal = [], 0
+        while legal < 120:
+            ball = rng.choice(choices)
+            balls.append(ball)
+            if ball not in ("Wd", "Nb"):
+                legal += 1
+        return balls
+
+    innings = [full_innings() for _ in range(calls)]
+
+    def call(i):
+        match = cricbuzz.Match("Team 1", players, "Team 2", players, 20)
+        match.scoreboard.play_match(innings[i])
+
+    return calls, call
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+
+def timed_pass(setup, scale):
+    calls, call = setup(scale)
+    latencies = []
+    start = time.perf_counter()
+    for i in range(calls):
+        call_start = time.perf_counter_ns()
+        call(i)
+        latencies.append(time.perf_counter_ns() - call_start)
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "wall_s": wall,
+        "mean_us": sum(latencies) / len(latencies) / 1000,
+        "p50_us": percentile(latencies, 50) / 1000,
+        "p90_us": percentile(latencies, 90) / 1000,
+        "p99_us": percentile(latencies, 99) / 1000,
+        "max_us": latencies[-1] / 1000,
+    }
+
+
+def timed_passes(selected, scale, repeat):
+    # one untimed warmup pass each, then the timed passes in rounds across all benchmarks, so a burst of load on
+    # the machine lands on one pass of a benchmark rather than all of them; every pass gets a fresh setup since
+    # some calls change their inputs
+    for setup in selected.values():
+        timed_pass(setup, scale)
+
+    passes = {name: [] for name in selected}
+    for _ in range(max(1, repeat)):
+        for name, setup in selected.items():
+            passes[name].append(timed_pass(setup, scale))
+
+    return passes
+
+
+def measure(name, setup, scale, passes, profile_dir=None):
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        # allocation and profile passes use a fresh setup so the timed passes are not traced
+        calls, call = setup(scale)
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        call_allocs = []
+        peak = 0
+        for i in range(calls):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            call(i)
+            call_peak = tracemalloc.get_traced_memory()[1]
+            call_allocs.append(call_peak - current)
+            peak = max(peak, call_peak)
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        retained = after.compare_to(before, "filename")
+
+        if profile_dir:
+            calls, call = setup(scale)
+            profiler = cProfile.Profile()
+            profiler.enable()
+            for i in range(calls):
+                call(i)
+            profiler.disable()
+            os.makedirs(profile_dir, exist_ok=True)
+            profiler.dump_stats(os.path.join(profile_dir, f"{name}.prof"))
+
+    result = {"calls": calls, "repeat": len(passes)}
+    for metric in passes[0]:
+        result[metric] = min(p[metric] for p in passes)
+    result.update({
+        "alloc_peak_bytes": peak,
+        "call_alloc_p50_bytes": percentile(sorted(call_allocs), 50),
+        "call_alloc_max_bytes": max(call_allocs),
+        "retained_blocks": sum(stat.count_diff for stat in retained),
+        "retained_bytes": sum(stat.size_diff for stat in retained),
+    })
+    return result
+
+
+def run(args):
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "scale": args.scale,
+            "repeat": args.repeat,
+        },
+        "benchmarks": {},
+    }
+
+    selected = {name: setup for name, setup in BENCHMARKS.items()
+                if not args.only or any(only in name for only in args.only)}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        passes = timed_passes(selected, args.scale, args.repeat)
+
+    for name, setup in selected.items():
+        result = measure(name, setup, args.scale, passes[name], args.profile_dir)
+        results["benchmarks"][name] = result
+        print(f"{name:<32} {result['calls']:>7} calls {result['wall_s']:>8.3f} s "
+              f"p50 {result['p50_us']:>9.1f} us p99 {result['p99_us']:>9.1f} us "
+              f"peak {result['alloc_peak_bytes'] / 1024:>9.1f} KiB")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    return 0
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)["benchmarks"]
+    with open(args.current) as f:
+        current = json.load(f)["benchmarks"]
+
+    regressions = 0
+    print(f"{'benchmark':<32} {'metric':>16} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name in sorted(set(baseline) & set(current)):
+        for metric in ("p50_us", "p99_us", "wall_s", "alloc_peak_bytes"):
+            old, new = baseline[name][metric], current[name][metric]
+            change = (new - old) / old if old else 0.0
+            # p99 and allocation peaks are noisy, they are reported but only p50 and wall time gate
+            flag = ""
+            if metric in ("p50_us", "wall_s") and change > args.threshold:
+                flag = "REGRESSION"
+                regressions += 1
+            print(f"{name:<32} {metric:>16} {old:>12.4g} {new:>12.4g} {change:>+8.1%} {flag}")
+
+    for name in sorted(set(baseline) ^ set(current)):
+        print(f"{name:<32} only in {'baseline' if name in baseline else 'current'}")
+
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LLD benchmark suite")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run the benchmarks and write JSON results")
+    run_parser.add_argument("--output", default="bench_results.json")
+    run_parser.add_argument("--scale", type=float, default=1.0, help="multiplier for the number of calls")
+    run_parser.add_argument("--repeat", type=int, default=5, help="timed passes per benchmark, the fastest is kept")
+    run_parser.add_argument("--only", action="append", help="run benchmarks whose name contains this")
+    run_parser.add_argument("--profile-dir", help="write a cProfile dump per benchmark here")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = subparsers.add_parser("compare", help="flag regressions between two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown, 0.10 = 10%%")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
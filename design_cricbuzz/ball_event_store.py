@@ -0,0 +1,154 @@
+"""
+Columnar store of every ball event, for player and match analytics across matches.
+
+BallEventStore
+ - one NumPy array per column: match, innings, over, ball, team, striker, runs, extra, wicket
+ - match ids, team and striker names are dictionary encoded to int ids
+ - record_ball() is the Scoreboard ball recorder hook: scoreboard.add_ball_recorder(store)
+ - vectorized queries: strike_rate(), boundary_percentage(), runs_per_phase(), head_to_head()
+"""
+
+import numpy as np
+
+EXTRA_NONE = 0
+EXTRA_WIDE = 1
+EXTRA_NO_BALL = 2
+EXTRA_CODES = {None: EXTRA_NONE, "Wd": EXTRA_WIDE, "Nb": EXTRA_NO_BALL}
+
+# (first over, last over exclusive) of a T20 innings
+DEFAULT_PHASES = (("powerplay", 0, 6), ("middle", 6, 15), ("death", 15, 20))
+
+
+class BallEventStore:
+    COLUMNS = (
+        ("match", np.int32),
+        ("innings", np.int8),
+        ("over", np.int16),
+        ("ball", np.int8),
+        ("team", np.int32),
+        ("striker", np.int32),
+        ("runs", np.int8),
+        ("extra", np.int8),
+        ("wicket", np.bool_),
+    )
+
+    def __init__(self, capacity=4096):
+        self._size = 0
+        self._capacity = capacity
+        self._columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.COLUMNS}
+        self._names = []
+        self._name_ids = {}
+
+    def __len__(self):
+        return self._size
+
+    def encode(self, name):
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._name_ids[name] = len(self._names)
+            self._names.append(name)
+        return name_id
+
+    def column(self, name):
+        return self._columns[name][:self._size]
+
+    def _reserve(self, extra_rows):
+        needed = self._size + extra_rows
+        if needed <= self._capacity:
+            return
+
+        capacity = max(needed, self._capacity * 2)
+        for name, values in self._columns.items():
+            grown = np.zeros(capacity, dtype=values.dtype)
+            grown[:self._size] = values[:self._size]
+            self._columns[name] = grown
+        self._capacity = capacity
+
+    def record_ball(self, match_id, innings, over, ball, batting_team, striker, runs, extra, wicket):
+        self._reserve(1)
+        i = self._size
+        columns = self._columns
+        columns["match"][i] = self.encode(match_id)
+        columns["innings"][i] = innings
+        columns["over"][i] = over
+        columns["ball"][i] = ball
+        columns["team"][i] = self.encode(batting_team)
+        columns["striker"][i] = self.encode(striker)
+        columns["runs"][i] = runs
+        columns["extra"][i] = EXTRA_CODES[extra]
+        columns["wicket"][i] = wicket
+        self._size += 1
+
+    def extend(self, **columns):
+        # bulk append of equal length arrays, match/team/striker must already be ids from encode()
+        rows = len(columns["match"])
+        self._reserve(rows)
+        for name, _ in self.COLUMNS:
+            self._columns[name][self._size:self._size + rows] = columns[name]
+        self._size += rows
+
+    def _name_mask(self, column, name):
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            return np.zeros(self._size, dtype=np.bool_)
+        return self.column(column) == name_id
+
+    def _batting(self, striker):
+        # runs off the bat and balls faced: wides are not a ball faced, extras are not the batsman's runs
+        mask = self._name_mask("striker", striker)
+        extra = self.column("extra")
+        runs = self.column("runs")
+        bat_runs = np.where(mask & (extra == EXTRA_NONE), runs, 0)
+        balls = np.count_nonzero(mask & (extra != EXTRA_WIDE))
+        return bat_runs, balls
+
+    def strike_rate(self, striker):
+        bat_runs, balls = self._batting(striker)
+        if not balls:
+            return 0.0
+        return float(bat_runs.sum()) * 100 / balls
+
+    def boundary_percentage(self, striker):
+        # share of the batsman's runs that came from fours and sixes
+        bat_runs, _ = self._batting(striker)
+        total = int(bat_runs.sum())
+        if not total:
+            return 0.0
+        boundary_runs = int(bat_runs[(bat_runs == 4) | (bat_runs == 6)].sum())
+        return boundary_runs * 100 / total
+
+    def runs_per_phase(self, phases=DEFAULT_PHASES, team=None, match_id=None):
+        over = self.column("over")
+        runs = self.column("runs")
+        if team is not None or match_id is not None:
+            mask = np.ones(self._size, dtype=np.bool_)
+            if team is not None:
+                mask &= self._name_mask("team", team)
+            if match_id is not None:
+                mask &= self._name_mask("match", match_id)
+            over, runs = over[mask], runs[mask]
+
+        # runs per over first (a handful of bins), phases are then just slices of it
+        per_over = np.bincount(over, weights=runs) if len(over) else np.zeros(0)
+        return {name: int(per_over[start:end].sum()) for name, start, end in phases}
+
+    def head_to_head(self, team_a, team_b):
+        match = self.column("match")
+        runs = self.column("runs")
+        mask_a = self._name_mask("team", team_a)
+        mask_b = self._name_mask("team", team_b)
+        # encoded ids are dense, so there are never more per-match bins than encoded values
+        length = len(self._names)
+
+        runs_a = np.bincount(match[mask_a], weights=runs[mask_a], minlength=length)
+        runs_b = np.bincount(match[mask_b], weights=runs[mask_b], minlength=length)
+        met = (np.bincount(match[mask_a], minlength=length) > 0) & (np.bincount(match[mask_b], minlength=length) > 0)
+
+        return {
+            "matches": int(np.count_nonzero(met)),
+            team_a: int(np.count_nonzero(met & (runs_a > runs_b))),
+            team_b: int(np.count_nonzero(met & (runs_b > runs_a))),
+            "ties": int(np.count_nonzero(met & (runs_a == runs_b))),
+            f"{team_a} runs": int(runs_a[met].sum()),
+            f"{team_b} runs": int(runs_b[met].sum()),
+        }
@@ -0,0 +1,63 @@
+"""
+Query latency of BallEventStore over a few million synthetic ball events.
+
+usage: python benchmark_ball_event_store.py [--balls 5000000]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from ball_event_store import BallEventStore
+
+BALLS_PER_INNINGS = 120
+
+
+def build_store(balls, teams=10, players=11, seed=42):
+    rng = np.random.default_rng(seed)
+    store = BallEventStore(capacity=balls)
+    team_ids = np.array([store.encode(f"Team {t}") for t in range(teams)], dtype=np.int32)
+    player_ids = np.array([[store.encode(f"Team {t} P{p}") for p in range(players)] for t in range(teams)],
+                          dtype=np.int32)
+
+    index = np.arange(balls)
+    innings_number = index // BALLS_PER_INNINGS
+    match = innings_number // 2
+    match_ids = np.array([store.encode(m) for m in range(int(match[-1]) + 1)], dtype=np.int32)
+    # each match is played between two neighbouring teams in the list
+    team = (match + innings_number % 2) % teams
+    store.extend(
+        match=match_ids[match],
+        innings=innings_number % 2 + 1,
+        over=(index % BALLS_PER_INNINGS) // 6,
+        ball=index % 6 + 1,
+        team=team_ids[team],
+        striker=player_ids[team, rng.integers(0, players, balls)],
+        runs=rng.choice([0, 1, 2, 3, 4, 6], balls, p=[0.38, 0.35, 0.1, 0.02, 0.11, 0.04]),
+        extra=rng.choice([0, 1, 2], balls, p=[0.94, 0.04, 0.02]),
+        wicket=rng.random(balls) < 0.04,
+    )
+    return store
+
+
+def timed(label, fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    print(f"{label:>22} {(time.perf_counter() - start) * 1000:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--balls", type=int, default=5_000_000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    store = build_store(args.balls)
+    print(f"built {len(store)} ball events in {time.perf_counter() - start:.2f} s")
+
+    timed("strike_rate", store.strike_rate, "Team 3 P0")
+    timed("boundary_percentage", store.boundary_percentage, "Team 3 P0")
+    timed("runs_per_phase", store.runs_per_phase)
+    timed("runs_per_phase (team)", store.runs_per_phase, team="Team 3")
+    timed("head_to_head", store.head_to_head, "Team 3", "Team 4")
@@ -0,0 +1,42 @@
+"""
+Throughput of MatchEngine.simulate (simulated matches/sec) for an increasing number of worker processes.
+
+usage: python benchmark_match_engine.py [--matches 2000] [--overs 20]
+"""
+
+import argparse
+import os
+import time
+
+from cricbuzz import Fixture, MatchEngine
+
+
+def make_fixtures(matches, overs, teams=10):
+    names = [f"Team {i}" for i in range(teams)]
+    fixtures = []
+    for n in range(matches):
+        home, away = names[n % teams], names[(n + 1 + n // teams) % teams]
+        if home == away:
+            away = names[(n + 1) % teams]
+        fixtures.append(Fixture(n, home, [f"{home} P{i}" for i in range(11)],
+                                away, [f"{away} P{i}" for i in range(11)], overs, seed=n))
+    return fixtures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--matches", type=int, default=2000)
+    parser.add_argument("--overs", type=int, default=20)
+    args = parser.parse_args()
+
+    fixtures = make_fixtures(args.matches, args.overs)
+    # powers of two, plus the full core count when it is not one of them
+    cpu_count = os.cpu_count()
+    worker_counts = sorted({2 ** i for i in range(cpu_count.bit_length()) if 2 ** i <= cpu_count} | {cpu_count})
+
+    print(f"{'workers':>8} {'matches/sec':>12}")
+    for workers in worker_counts:
+        engine = MatchEngine(max_workers=workers)
+        start = time.perf_counter()
+        engine.simulate(fixtures)
+        print(f"{workers:>8} {len(fixtures) / (time.perf_counter() - start):>12.0f}")
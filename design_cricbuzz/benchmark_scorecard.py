@@ -0,0 +1,60 @@
+"""
+Benchmark of per-ball ScoreDelta updates (Scoreboard.ingest) against re-rendering the full scorecard after
+every ball (Scoreboard.play_ball + Team.get_scorecard).
+
+usage: python benchmark_scorecard.py [--balls 100000] [--players 11]
+"""
+
+import argparse
+import random
+import time
+
+from cricbuzz import Scoreboard, Team
+
+BALL_CHOICES = ["0", "1", "2", "3", "4", "6", "Wd", "Nb"]
+
+
+def make_scoreboard(players):
+    team1 = Team("Team 1", [f"A{i}" for i in range(players)])
+    team2 = Team("Team 2", [f"B{i}" for i in range(players)])
+    return Scoreboard(team1, team2, overs=20)
+
+
+def full_render(balls, players):
+    scoreboard = make_scoreboard(players)
+    team = scoreboard.teams[0]
+    payload = 0
+    for ball in balls:
+        scoreboard.play_ball(ball)
+        payload += len(team.get_scorecard())
+    return payload
+
+
+def deltas(balls, players):
+    scoreboard = make_scoreboard(players)
+    payload = 0
+    for delta in scoreboard.ingest(balls):
+        payload += len(str(delta))
+    return payload
+
+
+def timed(fn, balls, players):
+    start = time.perf_counter()
+    payload = fn(balls, players)
+    return time.perf_counter() - start, payload
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--balls", type=int, default=100000)
+    parser.add_argument("--players", type=int, default=11)
+    args = parser.parse_args()
+
+    # no wickets so a single innings can run for any number of balls
+    rng = random.Random(42)
+    balls = [rng.choice(BALL_CHOICES) for _ in range(args.balls)]
+
+    print(f"{'mode':>12} {'balls/sec':>12} {'bytes/ball':>12}")
+    for name, fn in (("full render", full_render), ("delta", deltas)):
+        elapsed, payload = timed(fn, balls, args.players)
+        print(f"{name:>12} {len(balls) / elapsed:>12.0f} {payload / len(balls):>12.1f}")
@@ -20,6 +20,8 @@ Team
 ScoreBoard
  - team
  - overs
+ - add_ball_recorder() - observers fed every ball from input_ball (eg. BallEventStore in ball_event_store.py,
+   MatchLogWriter in match_log.py)
  - current_over
  - current_team_index
  - swap_teams()
@@ -30,9 +32,27 @@ ScoreBoard
  Match() - API Interface
   - start()
 
+ScoreDelta
+ - small per-ball update (changed batsman line, total, extras) emitted by Scoreboard.ingest()/ingest_async()
+   for live feeds instead of re-rendering the full scorecard
+
+MatchEngine
+ - plays many matches concurrently: a process pool for simulated fixtures, asyncio for live feeds
+ - points_table: PointsTable (points, net run rate); live matches move the run rate columns ball by ball through a
+   provisional entry that the final result replaces, points are only added once a match finishes
+
 Match
 """
 
+import asyncio
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+WICKET_BALLS = ("W", "w")
+EXTRA_BALLS = ("Wd", "Nb")
+
+
 class Player:
     def __init__(self, name):
         self.name = name
@@ -68,6 +88,7 @@ class Team:
         self.wickets = 0
         self.current_batsman = 0
         self.non_striker = 1
+        self.legal_balls = 0
 
     def add_runs(self, run, is_extra=False):
         self.total_runs += run
@@ -85,25 +106,85 @@ class Team:
     def swap_strike(self):
         self.current_batsman, self.non_striker = self.non_striker, self.current_batsman
 
+    @property
+    def is_all_out(self):
+        return self.wickets >= len(self.players) - 1
+
+    def crease_indices(self):
+        # the two batsmen at the crease and the next one in, the only lines a single ball can change
+        indices = {self.current_batsman, self.non_striker, max(self.current_batsman, self.non_striker) + 1}
+        return {index for index in indices if index < len(self.players)}
+
+    def batsman_state(self, index):
+        # everything batsman_line() renders, cheap to compare
+        player = self.players[index]
+        return player.runs, player.fours, player.sixes, player.balls_faced, player.is_out, index == self.current_batsman
+
+    def batsman_line(self, index):
+        player = self.players[index]
+        star = '*' if not player.is_out and index == self.current_batsman else ''
+        return f"{player.name}{star} {player.runs} {player.fours} {player.sixes} {player.balls_faced}"
+
+    def total_line(self):
+        return f"Total: {self.total_runs}/{self.wickets}, Extras: {self.extras}"
+
     def get_scorecard(self):
-        scorecard = f"Scorecard for {self.name}:\n"
-        for player in self.players:
-            star = '*' if not player.is_out and player == self.players[self.current_batsman] else ''
-            scorecard += f"{player.name}{star} {player.runs} {player.fours} {player.sixes} {player.balls_faced}\n"
-        scorecard += f"Total: {self.total_runs}/{self.wickets}, Extras: {self.extras}\n"
-        return scorecard
+        lines = [f"Scorecard for {self.name}:"]
+        lines.extend(self.batsman_line(index) for index in range(len(self.players)))
+        lines.append(self.total_line())
+        return "\n".join(lines) + "\n"
+
+
+class ScoreDelta:
+    def __init__(self, team_name, ball, over, batsman_lines, total_runs, wickets, extras, over_complete):
+        self.team_name = team_name
+        self.ball = ball
+        self.over = over
+        # (player index, line) for every batsman line the ball changed, in player order
+        self.batsman_lines = batsman_lines
+        self.total_runs = total_runs
+        self.wickets = wickets
+        self.extras = extras
+        self.over_complete = over_complete
+
+    def __str__(self):
+        lines = ", ".join(line for _, line in self.batsman_lines)
+        return f"{self.team_name} {self.over}: {lines} | Total: {self.total_runs}/{self.wickets}, Extras: {self.extras}"
 
 
 class Scoreboard:
-    def __init__(self, team1, team2, overs):
+    def __init__(self, team1, team2, overs, match_id=None):
         self.teams = [team1, team2]
         self.overs = overs
+        self.match_id = match_id
         self.current_over = 0
         self.current_team_index = 0
+        self.innings = 1
+        self._ball_recorders = []
+
+    def add_ball_recorder(self, recorder):
+        # recorder.record_ball(...) is called for every ball passed to input_ball; recorders are shared across
+        # matches, so the balls must carry an id that tells this match apart from the others
+        if self.match_id is None:
+            raise ValueError("A match_id is required to record balls")
+
+        self._ball_recorders.append(recorder)
+
+    def _record_ball(self, team, runs):
+        is_wicket = runs in WICKET_BALLS
+        extra = runs if runs in EXTRA_BALLS else None
+        for recorder in self._ball_recorders:
+            recorder.record_ball(match_id=self.match_id, innings=self.innings, over=self.current_over // 6,
+                                 ball=self.current_over % 6 + 1, batting_team=team.name,
+                                 striker=team.players[team.current_batsman].name,
+                                 runs=0 if is_wicket else 1 if extra else runs, extra=extra, wicket=is_wicket)
 
     def input_ball(self, runs):
         current_team = self.teams[self.current_team_index]
 
+        if self._ball_recorders:
+            self._record_ball(current_team, runs)
+
         if runs in ("W", "w"):
             current_team.wicket()
 
@@ -121,24 +202,65 @@ class Scoreboard:
 
         print(current_team.get_scorecard())
 
+    def over_label(self):
+        return f"{self.current_over // 6}.{self.current_over % 6}"
+
+    def play_ball(self, ball):
+        # returns True when this ball completes an over
+        if ball not in WICKET_BALLS + EXTRA_BALLS:
+            ball = int(ball)
+
+        self.input_ball(ball)
+
+        # wides and no-balls are re-bowled, they do not count towards the over
+        if ball in EXTRA_BALLS:
+            return False
+
+        self.current_over += 1
+        self.teams[self.current_team_index].legal_balls += 1
+        if self.current_over % 6 == 0:
+            self.teams[self.current_team_index].swap_strike()
+            return True
+
+        return False
+
     def play_match(self, balls):
         for ball in balls:
-            if ball in ("W", "w", "Wd", "Nb"):
-                    self.input_ball(ball)
-            else:
-                ball = int(ball)
-                self.input_ball(ball)
+            if self.play_ball(ball):
+                self.print_score()
+
+    def ingest(self, balls):
+        # any iterator of ball events, yields one ScoreDelta per ball
+        for ball in balls:
+            yield self._score_delta(ball)
+
+    async def ingest_async(self, balls):
+        # same as ingest() for an async stream of ball events
+        async for ball in balls:
+            yield self._score_delta(ball)
+
+    def _score_delta(self, ball):
+        current_team = self.teams[self.current_team_index]
+
+        # only the batsmen at the crease and the next one in can change: runs, the star moving on a single or at
+        # the end of the over, or a new batsman coming in after a wicket
+        candidates = sorted(current_team.crease_indices())
+        before = [current_team.batsman_state(index) for index in candidates]
+
+        over_complete = self.play_ball(ball)
 
-            if ball != "Wd" or ball != "Nb":
-                self.current_over += 1
+        # lines are only rendered for the batsmen whose state actually changed
+        changed = [(index, current_team.batsman_line(index)) for index, state in zip(candidates, before)
+                   if current_team.batsman_state(index) != state]
 
-                if self.current_over % 6 == 0:
-                    self.teams[self.current_team_index].swap_strike()
-                    self.print_score()
+        return ScoreDelta(current_team.name, ball, self.over_label(), changed,
+                          current_team.total_runs, current_team.wickets, current_team.extras, over_complete)
 
     def switch_team(self):
         # Switch to the other team
         self.current_team_index = 1 - self.current_team_index
+        self.current_over = 0
+        self.innings += 1
 
     def determine_winner(self):
         for team in self.teams:
@@ -154,13 +276,26 @@ class Scoreboard:
     def print_final_score(self):
         self.determine_winner()
 
+    def get_result(self, match_id=None):
+        team1, team2 = self.teams
+        if team1.total_runs > team2.total_runs:
+            winner = team1.name
+        elif team2.total_runs > team1.total_runs:
+            winner = team2.name
+        else:
+            winner = None
+
+        innings = [InningsResult(team.name, team.total_runs, team.wickets, team.legal_balls, team.is_all_out,
+                                 self.overs * 6) for team in self.teams]
+        return MatchResult(match_id, innings, winner)
+
 
 class Match:
-    def __init__(self, team1_name, team1_players, team2_name, team2_players, overs):
+    def __init__(self, team1_name, team1_players, team2_name, team2_players, overs, match_id=None):
         self.team1 = Team(team1_name, team1_players)
         self.team2 = Team(team2_name, team2_players)
 
-        self.scoreboard = Scoreboard(self.team1, self.team2, overs)
+        self.scoreboard = Scoreboard(self.team1, self.team2, overs, match_id)
 
     def start(self, team1_balls, team2_balls):
         self.scoreboard.play_match(team1_balls)
@@ -170,5 +305,221 @@ class Match:
         self.scoreboard.print_final_score()
 
 
-match = Match("Team 1", ["P1", "P2", "P3", "P4", "P5"], "Team 2", ["P6", "P7", "P8", "P9", "P10"], 2)
-match.start(["1", "1", "1", "1", "1", "2", "W", "4", "4", "Wd", "W", "1", "6"], ["4", "6", "W", "W", "1", "1", "6", "1", "W", "W"])
+class InningsResult:
+    def __init__(self, team_name, runs, wickets, legal_balls, all_out, quota_balls):
+        self.team_name = team_name
+        self.runs = runs
+        self.wickets = wickets
+        self.legal_balls = legal_balls
+        self.all_out = all_out
+        self.quota_balls = quota_balls
+
+    @property
+    def balls_for_run_rate(self):
+        # a side bowled out is counted as having faced its full quota of overs
+        return self.quota_balls if self.all_out else self.legal_balls
+
+
+class MatchResult:
+    def __init__(self, match_id, innings, winner):
+        self.match_id = match_id
+        self.innings = innings
+        self.winner = winner
+
+    def __str__(self):
+        scores = " vs ".join(f"{i.team_name} {i.runs}/{i.wickets}" for i in self.innings)
+        outcome = f"{self.winner} won" if self.winner else "tie"
+        return f"Match {self.match_id}: {scores} ({outcome})"
+
+
+class TableRow:
+    def __init__(self, team_name):
+        self.team_name = team_name
+        self.played = 0
+        self.won = 0
+        self.lost = 0
+        self.tied = 0
+        self.points = 0
+        self.runs_for = 0
+        self.balls_faced = 0
+        self.runs_against = 0
+        self.balls_bowled = 0
+
+    @property
+    def net_run_rate(self):
+        if not self.balls_faced or not self.balls_bowled:
+            return 0.0
+
+        return self.runs_for * 6 / self.balls_faced - self.runs_against * 6 / self.balls_bowled
+
+    def __str__(self):
+        return (f"{self.team_name} P:{self.played} W:{self.won} L:{self.lost} T:{self.tied} "
+                f"Pts:{self.points} NRR:{self.net_run_rate:+.3f}")
+
+
+class PointsTable:
+    WIN_POINTS = 2
+    TIE_POINTS = 1
+
+    def __init__(self):
+        self.rows = {}
+        # match id -> result so far of every match still in progress
+        self._provisional = {}
+
+    def _row(self, team_name):
+        row = self.rows.get(team_name)
+        if row is None:
+            row = self.rows[team_name] = TableRow(team_name)
+        return row
+
+    def _add_run_rate(self, result, sign):
+        batting, bowling = result.innings
+        for innings, opponent in ((batting, bowling), (bowling, batting)):
+            row = self._row(innings.team_name)
+            row.runs_for += sign * innings.runs
+            row.balls_faced += sign * innings.balls_for_run_rate
+            row.runs_against += sign * opponent.runs
+            row.balls_bowled += sign * opponent.balls_for_run_rate
+
+    def _drop_provisional(self, match_id):
+        previous = self._provisional.pop(match_id, None)
+        if previous is not None:
+            self._add_run_rate(previous, -1)
+
+    def record_provisional(self, result):
+        # the score so far of a match in progress, replaces the previous one for the same match
+        self._drop_provisional(result.match_id)
+        self._add_run_rate(result, 1)
+        self._provisional[result.match_id] = result
+
+    def record(self, result):
+        self._drop_provisional(result.match_id)
+        self._add_run_rate(result, 1)
+        batting, bowling = result.innings
+        for innings in (batting, bowling):
+            row = self._row(innings.team_name)
+            row.played += 1
+
+            if result.winner is None:
+                row.tied += 1
+                row.points += self.TIE_POINTS
+            elif result.winner == innings.team_name:
+                row.won += 1
+                row.points += self.WIN_POINTS
+            else:
+                row.lost += 1
+
+    def standings(self):
+        return sorted(self.rows.values(), key=lambda row: (row.points, row.net_run_rate), reverse=True)
+
+    def __str__(self):
+        return "\n".join(str(row) for row in self.standings())
+
+
+class Fixture:
+    def __init__(self, match_id, team1_name, team1_players, team2_name, team2_players, overs,
+                 team1_balls=None, team2_balls=None, seed=None):
+        # innings without balls are simulated from seed
+        self.match_id = match_id
+        self.team1_name = team1_name
+        self.team1_players = team1_players
+        self.team2_name = team2_name
+        self.team2_players = team2_players
+        self.overs = overs
+        self.team1_balls = team1_balls
+        self.team2_balls = team2_balls
+        self.seed = seed
+
+    def create_match(self):
+        return Match(self.team1_name, self.team1_players, self.team2_name, self.team2_players, self.overs,
+                     match_id=self.match_id)
+
+
+SIMULATED_BALLS = ["0", "1", "2", "3", "4", "6", "W", "Wd", "Nb"]
+SIMULATED_WEIGHTS = [35, 30, 8, 1, 10, 4, 5, 4, 3]
+
+
+def simulate_balls(scoreboard, rng, target=None):
+    # stops at the end of the overs, when the side is all out, or once the target is passed
+    team = scoreboard.teams[scoreboard.current_team_index]
+    while team.legal_balls < scoreboard.overs * 6 and not team.is_all_out:
+        if target is not None and team.total_runs > target:
+            return
+
+        yield rng.choices(SIMULATED_BALLS, SIMULATED_WEIGHTS)[0]
+
+
+def play_fixture(fixture):
+    # module level so it can be sent to a worker process
+    scoreboard = fixture.create_match().scoreboard
+    rng = random.Random(fixture.seed)
+
+    first_innings = fixture.team1_balls
+    if first_innings is None:
+        first_innings = simulate_balls(scoreboard, rng)
+    for _ in scoreboard.ingest(first_innings):
+        pass
+
+    scoreboard.switch_team()
+    second_innings = fixture.team2_balls
+    if second_innings is None:
+        second_innings = simulate_balls(scoreboard, rng, target=scoreboard.teams[0].total_runs)
+    for _ in scoreboard.ingest(second_innings):
+        pass
+
+    return scoreboard.get_result(fixture.match_id)
+
+
+def play_fixtures(fixtures):
+    # one chunk per task keeps the pickling overhead per match low
+    return [play_fixture(fixture) for fixture in fixtures]
+
+
+class MatchEngine:
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count()
+        self.points_table = PointsTable()
+        self.live_scores = {}
+
+    def simulate(self, fixtures, chunksize=16):
+        # CPU-bound, one process per core; the table is updated as each chunk finishes, whatever its position,
+        # so results are returned in completion order
+        fixtures = list(fixtures)
+        results = []
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(play_fixtures, fixtures[start:start + chunksize])
+                       for start in range(0, len(fixtures), chunksize)]
+            for future in as_completed(futures):
+                for result in future.result():
+                    self.points_table.record(result)
+                    results.append(result)
+
+        return results
+
+    async def run_live(self, live_fixtures):
+        # live_fixtures: (fixture, team1_feed, team2_feed) with an async stream of balls per innings
+        return await asyncio.gather(*(self._play_live(fixture, team1_feed, team2_feed)
+                                      for fixture, team1_feed, team2_feed in live_fixtures))
+
+    async def _play_live(self, fixture, team1_feed, team2_feed):
+        scoreboard = fixture.create_match().scoreboard
+
+        async for delta in scoreboard.ingest_async(team1_feed):
+            self._update_live(scoreboard, fixture.match_id, delta)
+
+        scoreboard.switch_team()
+        async for delta in scoreboard.ingest_async(team2_feed):
+            self._update_live(scoreboard, fixture.match_id, delta)
+
+        result = scoreboard.get_result(fixture.match_id)
+        self.points_table.record(result)
+        return result
+
+    def _update_live(self, scoreboard, match_id, delta):
+        self.live_scores[match_id] = delta
+        self.points_table.record_provisional(scoreboard.get_result(match_id))
+
+
+if __name__ == "__main__":
+    match = Match("Team 1", ["P1", "P2", "P3", "P4", "P5"], "Team 2", ["P6", "P7", "P8", "P9", "P10"], 2)
+    match.start(["1", "1", "1", "1", "1", "2", "W", "4", "4", "Wd", "W", "1", "6"], ["4", "6", "W", "W", "1", "1", "6", "1", "W", "W"])
@@ -0,0 +1,140 @@
+"""
+Compact binary log of the balls of a match, with random-access score reconstruction.
+
+MatchLogWriter
+ - Scoreboard ball recorder (scoreboard.add_ball_recorder(writer)), packs every ball into a fixed-width record
+ - every checkpoint_interval records it also packs a checkpoint of the batting side's state
+   (innings, legal balls, total, wickets, extras) as it was before that record
+ - close() writes header, records and checkpoints to the file in one go
+
+MatchLogReader
+ - memory-maps the file, record(i) unpacks a single ball
+ - score_at(innings, over, ball) -> (total, wickets, extras) after that delivery, eg. score_at(1, 14, 3) for 14.3,
+   starts at the nearest checkpoint so at most checkpoint_interval records are read
+
+layout: header | records | checkpoints
+"""
+
+import bisect
+import mmap
+import struct
+
+MAGIC = b"CBML"
+VERSION = 1
+
+# magic, version, record size, number of records, number of checkpoints, checkpoint interval
+HEADER = struct.Struct("<4sHHIII")
+# innings, over, ball in over, runs, extra (0 none, 1 wide, 2 no ball), wicket
+RECORD = struct.Struct("<BHBBBBx")
+# record index, innings, legal balls, total, wickets, extras
+CHECKPOINT = struct.Struct("<IHHHHHxx")
+
+EXTRA_CODES = {None: 0, "Wd": 1, "Nb": 2}
+
+
+class InningsState:
+    def __init__(self, innings):
+        self.innings = innings
+        self.legal_balls = 0
+        self.total = 0
+        self.wickets = 0
+        self.extras = 0
+
+    def apply(self, runs, extra, wicket):
+        # mirrors Team.add_runs / Team.wicket and Scoreboard.play_ball for one record
+        self.total += runs
+        if extra:
+            self.extras += 1
+        else:
+            self.legal_balls += 1
+        if wicket:
+            self.wickets += 1
+
+    def score(self):
+        return self.total, self.wickets, self.extras
+
+
+class MatchLogWriter:
+    def __init__(self, path, checkpoint_interval=60):
+        self.path = path
+        self.checkpoint_interval = checkpoint_interval
+        self._records = bytearray()
+        self._checkpoints = bytearray()
+        self._count = 0
+        self._state = None
+
+    def record_ball(self, match_id, innings, over, ball, batting_team, striker, runs, extra, wicket):
+        if self._state is None or self._state.innings != innings:
+            self._state = InningsState(innings)
+
+        state = self._state
+        if self._count % self.checkpoint_interval == 0:
+            self._checkpoints += CHECKPOINT.pack(self._count, innings, state.legal_balls, state.total,
+                                                 state.wickets, state.extras)
+
+        extra_code = EXTRA_CODES[extra]
+        self._records += RECORD.pack(innings, over, ball, runs, extra_code, wicket)
+        state.apply(runs, extra_code, wicket)
+        self._count += 1
+
+    def close(self):
+        checkpoint_count = len(self._checkpoints) // CHECKPOINT.size
+        header = HEADER.pack(MAGIC, VERSION, RECORD.size, self._count, checkpoint_count, self.checkpoint_interval)
+        with open(self.path, "wb") as f:
+            f.write(header + self._records + self._checkpoints)
+
+
+class MatchLogReader:
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, record_size, self.record_count, checkpoint_count, self.checkpoint_interval = \
+            HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            raise ValueError(f"{path} is not a version {VERSION} match log")
+
+        checkpoint_offset = HEADER.size + self.record_count * RECORD.size
+        self._checkpoints = [CHECKPOINT.unpack_from(self._mm, checkpoint_offset + i * CHECKPOINT.size)
+                             for i in range(checkpoint_count)]
+        self._checkpoint_keys = [(innings, legal_balls) for _, innings, legal_balls, _, _, _ in self._checkpoints]
+
+    def __len__(self):
+        return self.record_count
+
+    def record(self, index):
+        if not 0 <= index < self.record_count:
+            raise IndexError(index)
+        return RECORD.unpack_from(self._mm, HEADER.size + index * RECORD.size)
+
+    def score_at(self, innings, over, ball):
+        target = over * 6 + ball
+
+        # last checkpoint strictly before the target, its state is taken before its record
+        position = bisect.bisect_left(self._checkpoint_keys, (innings, target)) - 1
+        if position >= 0:
+            index, checkpoint_innings, legal_balls, total, wickets, extras = self._checkpoints[position]
+            state = InningsState(checkpoint_innings)
+            state.legal_balls, state.total, state.wickets, state.extras = legal_balls, total, wickets, extras
+        else:
+            index, state = 0, InningsState(innings)
+
+        for index in range(index, self.record_count):
+            record_innings, _, _, runs, extra, wicket = RECORD.unpack_from(self._mm, HEADER.size + index * RECORD.size)
+            if record_innings > innings:
+                break
+
+            if record_innings != state.innings:
+                state = InningsState(record_innings)
+            if state.innings == innings and state.legal_balls >= target:
+                break
+
+            state.apply(runs, extra, wicket)
+
+        if state.innings != innings:
+            return 0, 0, 0
+        return state.score()
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
@@ -0,0 +1,137 @@
+"""
+Fan-out publisher of live scores for many subscribers.
+
+ScorePublisher
+ - keeps a rendered fragment per batsman line and per total line, re-rendered only when the player / team
+   state behind it changed (dirty tracking)
+ - publish() encodes the changed fragments once into a delta with a sequence number and sends the same bytes
+   to every subscriber; a subscriber whose send() raises is dropped, the others still get the delta
+ - snapshot() is the full card built from the cached fragments, encoded once per sequence number
+ - catch_up(last_seq) returns the deltas after last_seq, or the snapshot when they are no longer kept
+
+Subscriber (Observer pattern)
+ - send(message) receives encoded bytes
+"""
+
+import json
+from abc import ABC, abstractmethod
+from collections import deque
+
+
+class Subscriber(ABC):
+    @abstractmethod
+    def send(self, message):
+        pass
+
+
+class ScorePublisher:
+    def __init__(self, scoreboard, history=1024):
+        self.scoreboard = scoreboard
+        self.seq = 0
+        self._subscribers = set()
+        self._deltas = deque(maxlen=history)
+        # (team index, line index or "total") -> (state key, rendered fragment)
+        self._fragments = {}
+        # team index -> batsmen at the crease (and next in) when changes were last collected
+        self._crease = {}
+        self._snapshot = None
+
+        self._collect_changes()
+
+    def subscribe(self, subscriber, last_seq=None):
+        # a reconnecting subscriber passes the last seq it saw and only gets what it missed
+        for message in self.catch_up(last_seq):
+            subscriber.send(message)
+        self._subscribers.add(subscriber)
+
+    def unsubscribe(self, subscriber):
+        self._subscribers.discard(subscriber)
+
+    def play(self, balls):
+        for delta in self.scoreboard.ingest(balls):
+            self.publish()
+            yield delta
+
+    def publish(self):
+        changes = self._collect_changes()
+        if not changes:
+            return None
+
+        self.seq += 1
+        message = self._encode({"seq": self.seq, "changes": changes})
+        self._deltas.append((self.seq, message))
+        self._snapshot = None
+
+        # a copy, subscribers may unsubscribe from inside send()
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.send(message)
+            except Exception:
+                # a dropped client must not stop the fan-out or the innings
+                self.unsubscribe(subscriber)
+
+        return message
+
+    def snapshot(self):
+        if self._snapshot is None:
+            cards = []
+            for team_index, team in enumerate(self.scoreboard.teams):
+                cards.append({
+                    "team": team.name,
+                    "lines": [self._fragments[(team_index, index)][1] for index in range(len(team.players))],
+                    "total": self._fragments[(team_index, "total")][1],
+                })
+            self._snapshot = self._encode({"seq": self.seq, "snapshot": cards})
+
+        return self._snapshot
+
+    def catch_up(self, last_seq):
+        if last_seq is None or last_seq > self.seq:
+            return [self.snapshot()]
+
+        if last_seq == self.seq:
+            return []
+
+        if not self._deltas or last_seq + 1 < self._deltas[0][0]:
+            return [self.snapshot()]
+
+        return [message for seq, message in self._deltas if seq > last_seq]
+
+    def _collect_changes(self):
+        changes = []
+        for team_index, team in enumerate(self.scoreboard.teams):
+            crease = team.crease_indices()
+            if team_index not in self._crease:
+                indices = range(len(team.players))
+            elif team_index == self.scoreboard.current_team_index:
+                # since the last collect only the batsmen who were at the crease then, or came in after them, can
+                # have changed (the batting order only moves forward)
+                previous = self._crease[team_index]
+                indices = sorted(previous | crease | set(range(max(previous, default=0), max(crease, default=0) + 1)))
+                indices = [index for index in indices if index < len(team.players)]
+            else:
+                indices = ()
+            self._crease[team_index] = crease
+
+            for index in indices:
+                key = team.batsman_state(index)
+                if self._is_dirty((team_index, index), key):
+                    line = team.batsman_line(index)
+                    self._fragments[(team_index, index)] = (key, line)
+                    changes.append({"team": team_index, "line": index, "text": line})
+
+            key = (team.total_runs, team.wickets, team.extras)
+            if self._is_dirty((team_index, "total"), key):
+                line = team.total_line()
+                self._fragments[(team_index, "total")] = (key, line)
+                changes.append({"team": team_index, "total": line})
+
+        return changes
+
+    def _is_dirty(self, fragment, key):
+        cached = self._fragments.get(fragment)
+        return cached is None or cached[0] != key
+
+    @staticmethod
+    def _encode(payload):
+        return json.dumps(payload, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,204 @@
+import asyncio
+import contextlib
+import io
+import json
+import random
+import unittest
+
+from ball_event_store import BallEventStore
+from cricbuzz import Fixture, Match, MatchEngine, PointsTable, play_fixture, simulate_balls
+from score_publisher import ScorePublisher, Subscriber
+
+
+def players(team_name):
+    return [f"{team_name} P{i}" for i in range(11)]
+
+
+class ScoreDeltaTest(unittest.TestCase):
+    def test_deltas_rebuild_the_full_scorecard_after_every_ball(self):
+        # a client that only applies deltas must always show what a full render shows
+        for seed in range(200):
+            scoreboard = Match("Team 1", players("Team 1"), "Team 2", players("Team 2"), 5, match_id=seed).scoreboard
+            rng = random.Random(seed)
+
+            for innings in range(2):
+                team = scoreboard.teams[scoreboard.current_team_index]
+                client = team.get_scorecard().splitlines()
+
+                for delta in scoreboard.ingest(simulate_balls(scoreboard, rng)):
+                    for index, line in delta.batsman_lines:
+                        client[index + 1] = line
+                    client[-1] = f"Total: {delta.total_runs}/{delta.wickets}, Extras: {delta.extras}"
+
+                    self.assertEqual("\n".join(client) + "\n", team.get_scorecard(),
+                                     f"seed {seed}, innings {innings + 1}, over {delta.over}")
+
+                scoreboard.switch_team()
+
+    def test_unchanged_lines_are_left_out(self):
+        scoreboard = Match("Team 1", players("Team 1"), "Team 2", players("Team 2"), 1).scoreboard
+
+        delta, = scoreboard.ingest(["0"])
+        self.assertEqual(delta.batsman_lines, [(0, "Team 1 P0* 0 0 0 1")])
+
+        delta, = scoreboard.ingest(["1"])
+        self.assertEqual(delta.batsman_lines, [(0, "Team 1 P0 1 0 0 2"), (1, "Team 1 P1* 0 0 0 0")])
+
+
+class PlayMatchTest(unittest.TestCase):
+    def play(self, scoreboard, balls):
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            scoreboard.play_match(balls)
+        return output.getvalue().count("Scorecard for")
+
+    def test_extras_do_not_count_towards_the_over(self):
+        scoreboard = Match("Team 1", players("Team 1"), "Team 2", players("Team 2"), 2).scoreboard
+
+        # 6 legal balls and 2 extras are one over, the scorecard is printed once at its end
+        self.assertEqual(self.play(scoreboard, ["1", "Wd", "0", "Nb", "0", "4", "0", "0"]), 1)
+        team = scoreboard.teams[0]
+        self.assertEqual(scoreboard.over_label(), "1.0")
+        self.assertEqual(team.legal_balls, 6)
+        self.assertEqual(team.extras, 2)
+        self.assertEqual(team.total_runs, 7)
+
+        self.assertEqual(self.play(scoreboard, ["Wd", "Wd", "Wd"]), 0)
+        self.assertEqual(scoreboard.over_label(), "1.0")
+        self.assertEqual(team.legal_balls, 6)
+
+    def test_second_innings_starts_from_the_first_over(self):
+        scoreboard = Match("Team 1", players("Team 1"), "Team 2", players("Team 2"), 1).scoreboard
+        self.play(scoreboard, ["0", "0", "0", "0", "0", "0"])
+
+        scoreboard.switch_team()
+        self.assertEqual(scoreboard.over_label(), "0.0")
+        self.assertEqual(self.play(scoreboard, ["Nb", "0", "0", "0", "0", "0", "0"]), 1)
+        self.assertEqual(scoreboard.teams[1].legal_balls, 6)
+        self.assertEqual(scoreboard.teams[0].legal_balls, 6)
+
+
+class LiveTableTest(unittest.TestCase):
+    def fixture(self, match_id, seed):
+        return Fixture(match_id, "Team 1", players("Team 1"), "Team 2", players("Team 2"), 2, seed=seed)
+
+    def test_final_result_replaces_the_provisional_one(self):
+        result = play_fixture(self.fixture(1, seed=1))
+        partial = Match("Team 1", players("Team 1"), "Team 2", players("Team 2"), 2, match_id=1).scoreboard
+        partial.play_match(["4", "1", "6"])
+
+        live, final_only = PointsTable(), PointsTable()
+        live.record_provisional(partial.get_result(1))
+        self.assertEqual(live.rows["Team 1"].runs_for, 11)
+        self.assertEqual(live.rows["Team 1"].played, 0)
+        live.record(result)
+        final_only.record(result)
+
+        self.assertEqual([vars(row) for row in live.standings()], [vars(row) for row in final_only.standings()])
+
+    def test_live_matches_move_the_table_ball_by_ball(self):
+        engine = MatchEngine()
+        balls = ["1", "4", "Wd", "6", "0", "W", "2", "1", "0", "4", "0", "0"]
+        seen = []
+
+        async def feed(team_index):
+            for ball in balls:
+                yield ball
+                # the previous ball has been recorded by the time the next one is requested
+                seen.append((team_index, engine.points_table.rows["Team 1"].runs_for,
+                             engine.points_table.rows["Team 2"].runs_for))
+
+        result, = asyncio.run(engine.run_live([(self.fixture(7, seed=None), feed(0), feed(1))]))
+
+        self.assertEqual(seen[0], (0, 1, 0))
+        self.assertEqual(seen[3], (0, 12, 0))
+        self.assertEqual(seen[-1], (1, 19, 19))
+        self.assertEqual(engine.points_table.rows["Team 1"].played, 1)
+        self.assertEqual(engine.points_table.rows["Team 1"].runs_for, result.innings[0].runs)
+
+
+class BallEventStoreTest(unittest.TestCase):
+    def test_any_match_id_can_be_recorded_and_queried(self):
+        store = BallEventStore(capacity=4)
+        for match_id, team1_balls, team2_balls in (("final", ["4", "1"], ["6", "0"]), (2_000_000_000, ["1"], ["2"]),
+                                                   (-3, ["0"], ["0"])):
+            match = Match("Team 1", players("Team 1"), "Team 2", players("Team 2"), 1, match_id=match_id)
+            match.scoreboard.add_ball_recorder(store)
+            with contextlib.redirect_stdout(io.StringIO()):
+                match.start(team1_balls, team2_balls)
+
+        self.assertEqual(len(store), 8)
+        self.assertEqual(store.runs_per_phase(phases=(("all", 0, 1),), match_id="final"), {"all": 11})
+        self.assertEqual(store.head_to_head("Team 1", "Team 2"), {
+            "matches": 3, "Team 1": 0, "Team 2": 2, "ties": 1, "Team 1 runs": 6, "Team 2 runs": 8,
+        })
+
+
+class RecordingSubscriber(Subscriber):
+    def __init__(self):
+        self.messages = []
+
+    def send(self, message):
+        self.messages.append(json.loads(message))
+
+
+class DroppedSubscriber(Subscriber):
+    def __init__(self):
+        self.connected = True
+
+    def send(self, message):
+        if not self.connected:
+            raise ConnectionError("client went away")
+
+
+class LeavingSubscriber(Subscriber):
+    def __init__(self, publisher):
+        self.publisher = publisher
+
+    def send(self, message):
+        self.publisher.unsubscribe(self)
+
+
+class ScorePublisherTest(unittest.TestCase):
+    def test_deltas_rebuild_the_snapshot(self):
+        for seed in range(50):
+            scoreboard = Match("Team 1", players("Team 1"), "Team 2", players("Team 2"), 5, match_id=seed).scoreboard
+            publisher = ScorePublisher(scoreboard)
+            subscriber = RecordingSubscriber()
+            publisher.subscribe(subscriber)
+            rng = random.Random(seed)
+
+            for _ in publisher.play(simulate_balls(scoreboard, rng)):
+                pass
+            scoreboard.switch_team()
+            for _ in publisher.play(simulate_balls(scoreboard, rng, target=scoreboard.teams[0].total_runs)):
+                pass
+
+            cards = subscriber.messages[0]["snapshot"]
+            for message in subscriber.messages[1:]:
+                for change in message["changes"]:
+                    card = cards[change["team"]]
+                    if "total" in change:
+                        card["total"] = change["total"]
+                    else:
+                        card["lines"][change["line"]] = change["text"]
+
+            expected = ScorePublisher(scoreboard).snapshot()
+            self.assertEqual(cards, json.loads(expected)["snapshot"], f"seed {seed}")
+
+    def test_failing_and_leaving_subscribers_do_not_stop_the_fan_out(self):
+        scoreboard = Match("Team 1", players("Team 1"), "Team 2", players("Team 2"), 1).scoreboard
+        publisher = ScorePublisher(scoreboard)
+        dropped, leaving, recording = DroppedSubscriber(), LeavingSubscriber(publisher), RecordingSubscriber()
+        for subscriber in (dropped, leaving, recording):
+            publisher.subscribe(subscriber)
+        dropped.connected = False
+
+        deltas = list(publisher.play(["1", "4", "W", "6"]))
+
+        self.assertEqual(len(deltas), 4)
+        self.assertEqual([message["seq"] for message in recording.messages], [0, 1, 2, 3, 4])
+        self.assertEqual(publisher._subscribers, {recording})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Benchmark of commands/sec through the write-ahead CommandLog at different group-commit windows.
+
+Every thread executes AddViewerCommand / RemoveViewerCommand on its own document, so the only shared
+resource is the log. A window of 0 fsyncs whatever is pending as soon as the writer wakes up.
+
+usage: python benchmark_command_log.py [--threads 32] [--commands 200]
+"""
+
+import argparse
+import shutil
+import tempfile
+import threading
+import time
+
+from doc_service import AddViewerCommand, CommandLog, DocumentService, RemoveViewerCommand, Viewer
+
+WINDOWS = [0, 0.0005, 0.001, 0.002, 0.005, 0.01]
+
+
+class QuietViewer(Viewer):
+    def update(self, message):
+        pass
+
+
+def run(window, threads, commands):
+    doc_service = DocumentService()
+    for i in range(threads):
+        doc_service.create_document(f"bench_doc_{i}", "")
+
+    log_dir = tempfile.mkdtemp(prefix="command_log_bench_")
+    command_log = CommandLog(log_dir, group_commit_window=window)
+    doc_service.attach_command_log(command_log, QuietViewer)
+
+    def worker(i):
+        document = doc_service.get_document(f"bench_doc_{i}")
+        # viewer names are unique per service, later runs reuse the viewer registered by the first one
+        viewer = doc_service.get_viewer(f"viewer_{i}") or QuietViewer(f"viewer_{i}")
+        for n in range(commands):
+            command_class = AddViewerCommand if n % 2 == 0 else RemoveViewerCommand
+            command_class(document, viewer).execute()
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    command_log.close()
+    shutil.rmtree(log_dir)
+    return threads * commands / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--commands", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'window (ms)':>12} {'commands/sec':>14}")
+    for window in WINDOWS:
+        print(f"{window * 1000:>12.1f} {run(window, args.threads, args.commands):>14.0f}")
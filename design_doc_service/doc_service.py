@@ -7,12 +7,30 @@ Document: to add, remove, view, add_observer, notify_viewers, remove_observers
 
 DocumentFacade: only to expose the required method to user like add, view, remove
 
-DocumentService: to contains all the documents of a user (Singleton pattern)
+DocumentService: to contains all the documents of a user (Singleton pattern), along with a reverse
+index of viewer -> doc ids so "what can a viewer see" and revoking a viewer everywhere do not scan every document
 
 Command: to execute the commands like add, remove,
+
+ContentStore: keeps document bodies on local disk, reads them lazily through mmap and keeps hot bodies in a
+size-bounded LRU cache
+
+CommandLog: write-ahead log of executed viewer commands with group commit (many concurrent commands share one
+fsync) and periodic snapshots of the viewer sets, replayed on startup
 """
 
+import hashlib
+import json
+import mmap
+import os
+import threading
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+# set while the command log's writer thread applies a command, notifications are queued here and delivered on the
+# caller's thread once the command is done
+_deferred = threading.local()
 
 
 class DocumentService:
@@ -22,24 +40,223 @@ class DocumentService:
         if cls._instance is None:
             cls._instance = super(DocumentService, cls).__new__(cls)
             cls._instance._documents = {}
+            cls._instance._viewer_index = {}
+            cls._instance._content_store = None
+            cls._instance._command_log = None
+            cls._instance._viewers_by_name = {}
 
         return cls._instance
 
+    def use_content_store(self, store):
+        # only the doc ids are listed here, bodies stay on disk until first read
+        self._content_store = store
+        for doc_id in store.doc_ids():
+            if doc_id not in self._documents:
+                self._documents[doc_id] = Document(doc_id, store=store)
+
     def create_document(self, doc_id, content):
         if doc_id not in self._documents:
-            self._documents[doc_id] = Document(doc_id, content)
+            self._documents[doc_id] = Document(doc_id, content, store=self._content_store)
 
     def get_document(self, doc_id):
         return self._documents.get(doc_id)
 
+    def attach_command_log(self, command_log, viewer_factory=None):
+        # documents must already exist (created or loaded from the content store) before replay
+        viewers = command_log.replay(self, viewer_factory or Viewer)
+        self._viewers_by_name.update(viewers)
+        self._command_log = command_log
+        return viewers
+
+    def get_viewer(self, name):
+        return self._viewers_by_name.get(name)
+
+    def run_command(self, op, doc_id, viewer, apply):
+        # with a command log attached the change is applied by the log's writer thread, after it is durable and
+        # in log order, so memory and the log never disagree about the order of two commands
+        if self._command_log is None:
+            return apply()
+
+        # the log identifies viewers by name, so a name must always mean the same Viewer object
+        known = self._viewers_by_name.setdefault(viewer.name, viewer)
+        if known is not viewer:
+            raise ValueError(f"Another viewer is already named {viewer.name}, use DocumentService.get_viewer()")
+
+        return self._command_log.append(op, doc_id, viewer.name, apply)
+
+    # reverse index: viewer -> doc ids, only the viewer commands (and replay) change it so it never gets ahead of the
+    # command log
+    def _index_viewer(self, doc_id, viewer):
+        self._viewer_index.setdefault(viewer, set()).add(doc_id)
+
+    def _unindex_viewer(self, doc_id, viewer):
+        doc_ids = self._viewer_index.get(viewer)
+        if doc_ids is None:
+            return
+
+        doc_ids.discard(doc_id)
+        if not doc_ids:
+            del self._viewer_index[viewer]
+
+    def get_documents_for_viewer(self, viewer):
+        documents = (self._documents.get(doc_id) for doc_id in self._viewer_index.get(viewer, ()))
+        return [document for document in documents if document is not None]
+
+    def revoke_all(self, viewer):
+        # goes through the command log like every other change to who can see what
+        return RevokeAllCommand(viewer).execute()
+
+    def _revoke_all(self, viewer):
+        # single pass over only the documents this viewer can see, each doc is unindexed once it is revoked so a
+        # failure partway through leaves the index matching the documents
+        doc_ids = list(self._viewer_index.get(viewer, ()))
+        for doc_id in doc_ids:
+            document = self._documents.get(doc_id)
+            try:
+                if document is not None:
+                    document.remove_viewers(viewer)
+            finally:
+                # the viewer is already gone from the document when an observer raises on the notification, so
+                # the observer registration and the index still follow it
+                if document is not None:
+                    document.discard_observer(viewer)
+                self._unindex_viewer(doc_id, viewer)
+
+        return doc_ids
+
+
+class ContentStore:
+    # file names are a prefix plus the sha256 of the doc id, so every name has the same short length and no doc id
+    # can map to ".", "..", "" or a temp file; the doc id itself is kept in a small id file next to the body
+    FILE_PREFIX = "doc-"
+    ID_PREFIX = "id-"
+    TMP_DIR = "tmp"
+
+    def __init__(self, root_dir, cache_size_bytes=64 * 1024 * 1024):
+        self.root_dir = root_dir
+        self.cache_size_bytes = cache_size_bytes
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+        os.makedirs(os.path.join(root_dir, self.TMP_DIR), exist_ok=True)
+
+    def _digest(self, doc_id):
+        return hashlib.sha256(doc_id.encode("utf-8")).hexdigest()
+
+    def _path(self, doc_id):
+        return os.path.join(self.root_dir, self.FILE_PREFIX + self._digest(doc_id))
+
+    def doc_ids(self):
+        doc_ids = []
+        for name in os.listdir(self.root_dir):
+            if not name.startswith(self.FILE_PREFIX):
+                continue
+
+            id_path = os.path.join(self.root_dir, self.ID_PREFIX + name[len(self.FILE_PREFIX):])
+            # the id file is written first, a body without one was never fully stored
+            if os.path.exists(id_path):
+                with open(id_path, "rb") as f:
+                    doc_ids.append(f.read().decode("utf-8"))
+
+        return doc_ids
+
+    def write(self, doc_id, content):
+        digest = self._digest(doc_id)
+        id_path = os.path.join(self.root_dir, self.ID_PREFIX + digest)
+        if not os.path.exists(id_path):
+            self._replace(id_path, digest, doc_id.encode("utf-8"))
+        self._replace(self._path(doc_id), digest, content.encode("utf-8"))
+
+        self._evict(doc_id)
+
+    def _replace(self, path, digest, data):
+        tmp_path = os.path.join(self.root_dir, self.TMP_DIR, digest)
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def size(self, doc_id):
+        return os.path.getsize(self._path(doc_id))
+
+    def read(self, doc_id):
+        if doc_id in self._cache:
+            self._cache.move_to_end(doc_id)
+            return self._cache[doc_id][0]
+
+        data = self.read_range(doc_id, 0)
+        content = data.decode("utf-8")
+        self._put(doc_id, content, len(data))
+        return content
+
+    def read_range(self, doc_id, offset, length=None):
+        # byte range straight from the mapped file, the whole body is never loaded
+        with open(self._path(doc_id), "rb") as f:
+            file_size = os.fstat(f.fileno()).st_size
+            if offset >= file_size:
+                return b""
+
+            end = file_size if length is None else min(file_size, offset + length)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return mapped[offset:end]
+
+    def iter_chunks(self, doc_id, chunk_size=64 * 1024):
+        with open(self._path(doc_id), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for offset in range(0, len(mapped), chunk_size):
+                    yield mapped[offset:offset + chunk_size]
+
+    def _put(self, doc_id, content, size):
+        if size > self.cache_size_bytes:
+            return
+
+        self._cache[doc_id] = (content, size)
+        self._cached_bytes += size
+        while self._cached_bytes > self.cache_size_bytes:
+            _, (_, evicted_size) = self._cache.popitem(last=False)
+            self._cached_bytes -= evicted_size
+
+    def _evict(self, doc_id):
+        cached = self._cache.pop(doc_id, None)
+        if cached is not None:
+            self._cached_bytes -= cached[1]
+
 
 class Document:
-    def __init__(self, doc_id, content):
+    def __init__(self, doc_id, content=None, store=None):
         self.doc_id = doc_id
-        self.content = content
+        self._content = None
+        self._store = store
         self._viewers = set()
         self._observers = set()
 
+        if store is None:
+            self._content = content
+        elif content is not None:
+            store.write(doc_id, content)
+
+    @property
+    def content(self):
+        if self._store is None:
+            return self._content
+
+        return self._store.read(self.doc_id)
+
+    @content.setter
+    def content(self, content):
+        if self._store is None:
+            self._content = content
+        else:
+            self._store.write(self.doc_id, content)
+
+    def read_content(self, offset=0, length=None):
+        if self._store is None:
+            data = self._content.encode("utf-8")
+            return data[offset:] if length is None else data[offset:offset + length]
+
+        return self._store.read_range(self.doc_id, offset, length)
+
     def add_viewers(self, viewer):
         self._viewers.add(viewer)
         self.notify_observers(f"Viewer {viewer} added")
@@ -54,13 +271,26 @@ class Document:
     def remove_observer(self, observer):
         self._observers.remove(observer)
 
+    def discard_observer(self, observer):
+        self._observers.discard(observer)
+
     def notify_observers(self, message):
-        for observer in self._observers:
+        notifications = getattr(_deferred, "notifications", None)
+        if notifications is not None:
+            notifications.append((list(self._observers), message))
+            return
+
+        for observer in list(self._observers):
             observer.update(message)
 
     def get_viewers(self):
         return list(self._viewers)
 
+    def restore_viewer(self, viewer):
+        # used by replay, no notifications are sent for state that already existed
+        self._viewers.add(viewer)
+        self._observers.add(viewer)
+
 
 class Observer(ABC):
     @abstractmethod
@@ -91,8 +321,12 @@ class AddViewerCommand(Command):
         self.viewer = viewer
 
     def execute(self):
+        DocumentService().run_command("add", self.document.doc_id, self.viewer, self._apply)
+
+    def _apply(self):
         self.document.add_viewers(self.viewer)
         self.document.register_observer(self.viewer)
+        DocumentService()._index_viewer(self.document.doc_id, self.viewer)
 
 
 class RemoveViewerCommand(Command):
@@ -101,8 +335,262 @@ class RemoveViewerCommand(Command):
         self.viewer = viewer
 
     def execute(self):
+        DocumentService().run_command("remove", self.document.doc_id, self.viewer, self._apply)
+
+    def _apply(self):
         self.document.remove_viewers(self.viewer)
         self.document.remove_observer(self.viewer)
+        DocumentService()._unindex_viewer(self.document.doc_id, self.viewer)
+
+
+class RevokeAllCommand(Command):
+    def __init__(self, viewer):
+        self.viewer = viewer
+
+    def execute(self):
+        doc_service = DocumentService()
+        return doc_service.run_command("revoke_all", None, self.viewer, lambda: doc_service._revoke_all(self.viewer))
+
+
+class PendingCommand:
+    def __init__(self, op, doc_id, viewer_name, apply):
+        self.op = op
+        self.doc_id = doc_id
+        self.viewer_name = viewer_name
+        self.apply = apply
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.notifications = []
+
+
+class CommandLog:
+    LOG_FILE = "commands.log"
+    SNAPSHOT_FILE = "viewers.snapshot"
+
+    def __init__(self, log_dir, group_commit_window=0.002, snapshot_every=10000):
+        self.log_dir = log_dir
+        self.group_commit_window = group_commit_window
+        self.snapshot_every = snapshot_every
+        os.makedirs(log_dir, exist_ok=True)
+
+        # mirror of the viewer sets (by viewer name) in log order, this is what snapshots are taken from
+        self._viewer_sets = {}
+        self._viewer_docs = {}
+        self._seq = 0
+        self._since_snapshot = 0
+        self._load()
+
+        self._pending = []
+        self._broken = None
+        self._closed = False
+        self._cond = threading.Condition()
+        # unbuffered, so bytes of a failed write are never flushed later behind our back
+        self._file = open(os.path.join(log_dir, self.LOG_FILE), "ab", buffering=0)
+        self._writer = threading.Thread(target=self._run, daemon=True)
+        self._writer.start()
+
+    def append(self, op, doc_id, viewer_name, apply=None):
+        # blocks until the record is durable and apply() has run on the writer thread, callers that arrive
+        # together share a single fsync; returns what apply() returned
+        if threading.current_thread() is self._writer:
+            # the writer would wait on itself
+            raise RuntimeError("A logged command cannot append another command while it is applied")
+
+        command = PendingCommand(op, doc_id, viewer_name, apply)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Command log is closed")
+
+            self._pending.append(command)
+            self._cond.notify()
+
+        command.done.wait()
+        # observers run here rather than on the writer, so one that reacts with another command can append it
+        for observers, message in command.notifications:
+            for observer in observers:
+                observer.update(message)
+
+        if command.error is not None:
+            raise command.error
+
+        return command.result
+
+    def replay(self, doc_service, viewer_factory):
+        viewers = {}
+        for doc_id, names in self._viewer_sets.items():
+            document = doc_service.get_document(doc_id)
+            if document is None:
+                continue
+
+            for name in names:
+                viewer = viewers.get(name)
+                if viewer is None:
+                    viewer = viewers[name] = viewer_factory(name)
+
+                document.restore_viewer(viewer)
+                doc_service._index_viewer(doc_id, viewer)
+
+        return viewers
+
+    def get_viewer_sets(self):
+        return {doc_id: set(names) for doc_id, names in self._viewer_sets.items()}
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+        self._writer.join()
+        self._file.close()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+
+                if not self._pending:
+                    return
+
+            # give concurrent commands a window to join this group before the fsync
+            if self.group_commit_window:
+                time.sleep(self.group_commit_window)
+
+            with self._cond:
+                batch, self._pending = self._pending, []
+
+            try:
+                self._process(batch)
+            finally:
+                # whatever happened, nobody is left waiting
+                for command in batch:
+                    command.done.set()
+
+    def _process(self, batch):
+        try:
+            self._commit(batch)
+        except Exception as e:
+            # only this batch fails, the next one starts from a clean log tail
+            for command in batch:
+                command.error = RuntimeError("Command log write failed")
+                command.error.__cause__ = e
+            return
+
+        # in-memory changes are made here, one at a time and in the order they were logged
+        for command in batch:
+            if command.apply is not None:
+                _deferred.notifications = command.notifications
+                try:
+                    command.result = command.apply()
+                except Exception as e:
+                    command.error = e
+                finally:
+                    _deferred.notifications = None
+
+        if self._since_snapshot >= self.snapshot_every:
+            try:
+                self._snapshot()
+            except Exception:
+                # the records are already durable in the log, the snapshot is retried after the next batch
+                pass
+
+    def _commit(self, batch):
+        if self._broken is not None:
+            raise RuntimeError("Command log tail could not be repaired") from self._broken
+
+        lines = []
+        for seq, command in enumerate(batch, self._seq + 1):
+            lines.append(json.dumps([seq, command.op, command.doc_id, command.viewer_name]))
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+
+        offset = os.fstat(self._file.fileno()).st_size
+        try:
+            written = 0
+            while written < len(data):
+                written += self._file.write(data[written:])
+            os.fsync(self._file.fileno())
+        except Exception:
+            # drop a partly written group so replay never sees records that were reported as failed
+            try:
+                os.ftruncate(self._file.fileno(), offset)
+            except OSError as e:
+                self._broken = e
+            raise
+
+        # the mirror (and so every later snapshot) only ever holds durable records
+        for command in batch:
+            self._apply(command.op, command.doc_id, command.viewer_name)
+        self._seq += len(batch)
+        self._since_snapshot += len(batch)
+
+    def _apply(self, op, doc_id, viewer_name):
+        if op == "add":
+            self._viewer_sets.setdefault(doc_id, set()).add(viewer_name)
+            self._viewer_docs.setdefault(viewer_name, set()).add(doc_id)
+
+        elif op == "remove":
+            self._viewer_sets.get(doc_id, set()).discard(viewer_name)
+            self._viewer_docs.get(viewer_name, set()).discard(doc_id)
+
+        elif op == "revoke_all":
+            for revoked_doc_id in self._viewer_docs.pop(viewer_name, set()):
+                self._viewer_sets[revoked_doc_id].discard(viewer_name)
+
+    def _snapshot(self):
+        snapshot_path = os.path.join(self.log_dir, self.SNAPSHOT_FILE)
+        state = {
+            "seq": self._seq,
+            "viewers": {doc_id: sorted(names) for doc_id, names in self._viewer_sets.items() if names},
+        }
+        with open(snapshot_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(snapshot_path + ".tmp", snapshot_path)
+
+        # everything up to seq is in the snapshot now, replay skips it even if the truncate is lost
+        self._file.truncate(0)
+        os.fsync(self._file.fileno())
+        self._since_snapshot = 0
+
+    def _load(self):
+        snapshot_path = os.path.join(self.log_dir, self.SNAPSHOT_FILE)
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, encoding="utf-8") as f:
+                state = json.load(f)
+
+            self._seq = state["seq"]
+            for doc_id, names in state["viewers"].items():
+                for name in names:
+                    self._apply("add", doc_id, name)
+
+        log_path = os.path.join(self.log_dir, self.LOG_FILE)
+        if not os.path.exists(log_path):
+            return
+
+        valid_bytes = 0
+        with open(log_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+
+                try:
+                    seq, op, doc_id, viewer_name = json.loads(line)
+                except ValueError:
+                    # torn write from a crash mid-group, nothing after it was acknowledged
+                    break
+
+                valid_bytes += len(line)
+                if seq <= self._seq:
+                    continue
+
+                self._seq = seq
+                self._since_snapshot += 1
+                self._apply(op, doc_id, viewer_name)
+
+        if valid_bytes != os.path.getsize(log_path):
+            os.truncate(log_path, valid_bytes)
 
 
 class DocumentFacade:
@@ -131,6 +619,13 @@ class DocumentFacade:
 
         return []
 
+    def view_documents(self, viewer):
+        return [document.doc_id for document in self.doc_service.get_documents_for_viewer(viewer)]
+
+    def revoke_all(self, viewer):
+        command = RevokeAllCommand(viewer)
+        return command.execute()
+
 
 if __name__ == "__main__":
     doc_facade = DocumentFacade()
@@ -153,6 +648,14 @@ if __name__ == "__main__":
     # View current viewers again
     print("Current viewers after removal:", doc_facade.view_viewers("doc_1"))
 
+    # Documents visible to a viewer, then offboard them everywhere
+    doc_facade.doc_service.create_document("doc_2", "Another doc")
+    doc_facade.add_viewer("doc_2", Alice)
+    print("Alice can view:", doc_facade.view_documents(Alice))
+
+    doc_facade.revoke_all(Alice)
+    print("Alice can view after revoke:", doc_facade.view_documents(Alice))
+
 
 
 
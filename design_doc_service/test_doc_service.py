@@ -0,0 +1,294 @@
+import os
+import random
+import shutil
+import tempfile
+import threading
+import unittest
+
+from doc_service import (AddViewerCommand, CommandLog, ContentStore, Document, DocumentFacade, DocumentService,
+                         RemoveViewerCommand, RevokeAllCommand, Viewer)
+
+
+class QuietViewer(Viewer):
+    def update(self, message):
+        pass
+
+
+def live_viewer_sets(doc_service, doc_ids):
+    return {doc_id: {viewer.name for viewer in doc_service.get_document(doc_id).get_viewers()} for doc_id in doc_ids}
+
+
+class FailingObserver(Viewer):
+    def update(self, message):
+        raise RuntimeError(f"could not deliver {message}")
+
+
+class ViewerIndexTest(unittest.TestCase):
+    DOC_IDS = ["doc_0", "doc_1", "doc_2", "doc_3"]
+
+    def setUp(self):
+        DocumentService._instance = None
+        self.facade = DocumentFacade()
+        for doc_id in self.DOC_IDS:
+            self.facade.doc_service.create_document(doc_id, "")
+
+    def tearDown(self):
+        DocumentService._instance = None
+
+    def assert_consistent(self, viewer):
+        # the index, the documents' viewer sets and their observers must all tell the same story
+        doc_service = self.facade.doc_service
+        indexed = set(self.facade.view_documents(viewer))
+        for doc_id in self.DOC_IDS:
+            document = doc_service.get_document(doc_id)
+            self.assertEqual(viewer in document.get_viewers(), doc_id in indexed, doc_id)
+            self.assertEqual(viewer in document._observers, doc_id in indexed, doc_id)
+
+    def test_add_remove_and_revoke_all_keep_index_and_documents_in_sync(self):
+        alice, bob = QuietViewer("alice"), QuietViewer("bob")
+        for doc_id in self.DOC_IDS:
+            self.facade.add_viewer(doc_id, alice)
+        self.facade.add_viewer("doc_1", bob)
+        self.facade.remove_viewer("doc_2", alice)
+
+        self.assertEqual(sorted(self.facade.view_documents(alice)), ["doc_0", "doc_1", "doc_3"])
+        self.assert_consistent(alice)
+        self.assert_consistent(bob)
+
+        self.assertEqual(sorted(self.facade.revoke_all(alice)), ["doc_0", "doc_1", "doc_3"])
+        self.assertEqual(self.facade.view_documents(alice), [])
+        self.assert_consistent(alice)
+        self.assertEqual(self.facade.view_documents(bob), ["doc_1"])
+        self.assert_consistent(bob)
+
+    def test_unknown_documents_are_skipped(self):
+        alice = QuietViewer("alice")
+        self.facade.add_viewer("doc_0", alice)
+        # a document the service does not hold still goes through the commands and the index
+        orphan = Document("orphan", "")
+        AddViewerCommand(orphan, alice).execute()
+
+        self.assertEqual(self.facade.view_documents(alice), ["doc_0"])
+        self.assertEqual(sorted(RevokeAllCommand(alice).execute()), ["doc_0", "orphan"])
+        self.assertEqual(self.facade.view_documents(alice), [])
+        self.assertEqual(self.facade.doc_service._viewer_index, {})
+        self.assert_consistent(alice)
+
+    def test_failure_partway_through_revoke_all_leaves_index_consistent(self):
+        alice = QuietViewer("alice")
+        for doc_id in self.DOC_IDS:
+            self.facade.add_viewer(doc_id, alice)
+        self.facade.doc_service.get_document("doc_2").register_observer(FailingObserver("broken"))
+
+        with self.assertRaises(RuntimeError):
+            self.facade.revoke_all(alice)
+
+        self.assertNotIn("doc_2", self.facade.view_documents(alice))
+        self.assert_consistent(alice)
+
+        # the documents the failure cut off are revoked by a retry
+        self.facade.revoke_all(alice)
+        self.assertEqual(self.facade.view_documents(alice), [])
+        self.assert_consistent(alice)
+
+
+class ContentStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.root_dir = tempfile.mkdtemp()
+        self.store = ContentStore(self.root_dir, cache_size_bytes=64)
+
+    def tearDown(self):
+        shutil.rmtree(self.root_dir)
+
+    def test_awkward_doc_ids_round_trip(self):
+        doc_ids = ["x" * 200, "\u00e9" * 150, ".", "..", "", "tmp", "notes.tmp", "a/b", "doc-1"]
+        for doc_id in doc_ids:
+            self.store.write(doc_id, f"body of {doc_id}")
+
+        reopened = ContentStore(self.root_dir)
+        self.assertEqual(sorted(reopened.doc_ids()), sorted(doc_ids))
+        for doc_id in doc_ids:
+            self.assertEqual(reopened.read(doc_id), f"body of {doc_id}")
+
+    def test_overwrite_replaces_body_and_cache(self):
+        self.store.write("doc", "first")
+        self.assertEqual(self.store.read("doc"), "first")
+        self.store.write("doc", "second")
+
+        self.assertEqual(self.store.read("doc"), "second")
+        self.assertEqual(self.store.doc_ids(), ["doc"])
+
+    def test_read_range_bounds(self):
+        self.store.write("doc", "0123456789")
+
+        self.assertEqual(self.store.read_range("doc", 0), b"0123456789")
+        self.assertEqual(self.store.read_range("doc", 3, 4), b"3456")
+        self.assertEqual(self.store.read_range("doc", 8, 100), b"89")
+        self.assertEqual(self.store.read_range("doc", 9, 1), b"9")
+        self.assertEqual(self.store.read_range("doc", 10), b"")
+        self.assertEqual(self.store.read_range("doc", 50, 5), b"")
+        self.assertEqual(self.store.read_range("doc", 2, 0), b"")
+
+        self.store.write("empty", "")
+        self.assertEqual(self.store.read_range("empty", 0), b"")
+
+    def test_iter_chunks_bounds(self):
+        self.store.write("doc", "0123456789")
+
+        self.assertEqual(list(self.store.iter_chunks("doc", chunk_size=5)), [b"01234", b"56789"])
+        self.assertEqual(list(self.store.iter_chunks("doc", chunk_size=4)), [b"0123", b"4567", b"89"])
+        self.assertEqual(list(self.store.iter_chunks("doc", chunk_size=100)), [b"0123456789"])
+
+        self.store.write("empty", "")
+        self.assertEqual(list(self.store.iter_chunks("empty")), [])
+
+
+class CommandLogTest(unittest.TestCase):
+    DOC_IDS = ["doc_0", "doc_1", "doc_2"]
+
+    def setUp(self):
+        DocumentService._instance = None
+        self.log_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        DocumentService._instance = None
+        shutil.rmtree(self.log_dir)
+
+    def new_service(self, command_log):
+        doc_service = DocumentService()
+        for doc_id in self.DOC_IDS:
+            doc_service.create_document(doc_id, "")
+        doc_service.attach_command_log(command_log, QuietViewer)
+        return doc_service
+
+    def test_replay_matches_live_state_under_concurrent_commands(self):
+        command_log = CommandLog(self.log_dir, group_commit_window=0.005, snapshot_every=97)
+        doc_service = self.new_service(command_log)
+        viewers = [QuietViewer(f"viewer_{i}") for i in range(2)]
+
+        def worker(seed):
+            # every thread hits the same few (doc, viewer) pairs so adds and removes share groups
+            rng = random.Random(seed)
+            for _ in range(100):
+                document = doc_service.get_document(rng.choice(self.DOC_IDS))
+                command_class = rng.choice([AddViewerCommand, RemoveViewerCommand])
+                try:
+                    command_class(document, rng.choice(viewers)).execute()
+                except KeyError:
+                    # removing a viewer the document does not have
+                    pass
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(16)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        command_log.close()
+        live = live_viewer_sets(doc_service, self.DOC_IDS)
+
+        reopened = CommandLog(self.log_dir)
+        self.assertEqual({doc_id: reopened.get_viewer_sets().get(doc_id, set()) for doc_id in self.DOC_IDS}, live)
+
+        DocumentService._instance = None
+        replayed = self.new_service(reopened)
+        self.assertEqual(live_viewer_sets(replayed, self.DOC_IDS), live)
+        reopened.close()
+
+    def test_failed_write_is_not_applied_and_does_not_poison_the_log(self):
+        command_log = CommandLog(self.log_dir, group_commit_window=0)
+        doc_service = self.new_service(command_log)
+        document = doc_service.get_document("doc_0")
+        alice, bob = QuietViewer("alice"), QuietViewer("bob")
+
+        real_fsync = os.fsync
+
+        def failing_fsync(fd):
+            raise OSError("disk full")
+
+        os.fsync = failing_fsync
+        try:
+            with self.assertRaises(RuntimeError):
+                AddViewerCommand(document, alice).execute()
+        finally:
+            os.fsync = real_fsync
+
+        AddViewerCommand(document, bob).execute()
+        command_log.close()
+
+        self.assertEqual(document.get_viewers(), [bob])
+        self.assertEqual(CommandLog(self.log_dir).get_viewer_sets(), {"doc_0": {"bob"}})
+
+    def test_exceptions_reach_the_caller_and_the_writer_keeps_running(self):
+        command_log = CommandLog(self.log_dir, group_commit_window=0)
+
+        def apply():
+            raise ValueError("apply failed")
+
+        with self.assertRaises(ValueError):
+            command_log.append("add", "doc_0", "alice", apply)
+        # not JSON serializable, fails inside the commit itself
+        with self.assertRaises(RuntimeError):
+            command_log.append("add", object(), "alice")
+
+        self.assertEqual(command_log.append("add", "doc_1", "bob", lambda: "applied"), "applied")
+        command_log.close()
+
+    def test_service_revoke_all_is_logged(self):
+        command_log = CommandLog(self.log_dir, group_commit_window=0)
+        doc_service = self.new_service(command_log)
+        alice = QuietViewer("alice")
+        for doc_id in self.DOC_IDS:
+            AddViewerCommand(doc_service.get_document(doc_id), alice).execute()
+
+        self.assertEqual(sorted(doc_service.revoke_all(alice)), self.DOC_IDS)
+        command_log.close()
+
+        DocumentService._instance = None
+        reopened = CommandLog(self.log_dir)
+        replayed = self.new_service(reopened)
+        self.assertEqual(live_viewer_sets(replayed, self.DOC_IDS), {doc_id: set() for doc_id in self.DOC_IDS})
+        reopened.close()
+
+    def test_observer_can_run_a_command_from_a_notification(self):
+        command_log = CommandLog(self.log_dir, group_commit_window=0)
+        doc_service = self.new_service(command_log)
+        bob = QuietViewer("bob")
+
+        class ForwardingViewer(Viewer):
+            # shares doc_1 with bob as soon as anyone else is added next to it
+            def update(self, message):
+                if message == "Viewer carol added":
+                    AddViewerCommand(doc_service.get_document("doc_1"), bob).execute()
+
+        document = doc_service.get_document("doc_0")
+        AddViewerCommand(document, ForwardingViewer("alice")).execute()
+        worker = threading.Thread(target=AddViewerCommand(document, QuietViewer("carol")).execute, daemon=True)
+        worker.start()
+        worker.join(timeout=5)
+        self.assertFalse(worker.is_alive(), "command log writer deadlocked")
+
+        self.assertEqual(live_viewer_sets(doc_service, self.DOC_IDS),
+                         {"doc_0": {"alice", "carol"}, "doc_1": {"bob"}, "doc_2": set()})
+        command_log.close()
+        self.assertEqual(CommandLog(self.log_dir).get_viewer_sets(), {"doc_0": {"alice", "carol"}, "doc_1": {"bob"}})
+
+    def test_viewer_names_must_be_unique(self):
+        command_log = CommandLog(self.log_dir, group_commit_window=0)
+        doc_service = self.new_service(command_log)
+        alice = QuietViewer("alice")
+        AddViewerCommand(doc_service.get_document("doc_0"), alice).execute()
+
+        with self.assertRaises(ValueError):
+            AddViewerCommand(doc_service.get_document("doc_1"), QuietViewer("alice")).execute()
+        command_log.close()
+
+        DocumentService._instance = None
+        reopened = CommandLog(self.log_dir)
+        replayed = self.new_service(reopened)
+        replayed_alice = replayed.get_viewer("alice")
+        self.assertEqual(replayed.get_documents_for_viewer(replayed_alice), [replayed.get_document("doc_0")])
+        reopened.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -135,33 +135,32 @@ class SprintManager:
                     task.print_details()
 
 
-story = TaskFactory.create_task("Story", "User Authentication")
-feature = TaskFactory.create_task("Feature", "Login Page", assignee="Alice")
-bug = TaskFactory.create_task("Bug", "Fix Login Button", assignee="Bob")
-
-# Adding subtasks to a story
-subtask1 = TaskFactory.create_task("Feature", "Design Login Form", assignee="Charlie")
-subtask2 = TaskFactory.create_task("Feature", "Implement Login Logic", assignee="Dave")
-story.add_subtask(subtask1)
-story.add_subtask(subtask2)
-
-# Creating a Sprint and adding tasks
-sprint_manager = SprintManager()
-sprint = sprint_manager.create_sprint("Sprint 1")
-sprint.add_task(story)
-sprint.add_task(feature)
-sprint.add_task(bug)
-
-# Changing status of a task
-bug.change_status(TaskStatus.IN_PROGRESS)
-
-# Print Sprint details
-sprint_manager.print_sprint_details()
-
-# Print delayed tasks
-sprint_manager.print_delayed_task()
-
-# Print tasks assigned to a user
-sprint_manager.print_user_tasks("Bob")
-
-
+if __name__ == "__main__":
+    story = TaskFactory.create_task("Story", "User Authentication")
+    feature = TaskFactory.create_task("Feature", "Login Page", assignee="Alice")
+    bug = TaskFactory.create_task("Bug", "Fix Login Button", assignee="Bob")
+
+    # Adding subtasks to a story
+    subtask1 = TaskFactory.create_task("Feature", "Design Login Form", assignee="Charlie")
+    subtask2 = TaskFactory.create_task("Feature", "Implement Login Logic", assignee="Dave")
+    story.add_subtask(subtask1)
+    story.add_subtask(subtask2)
+
+    # Creating a Sprint and adding tasks
+    sprint_manager = SprintManager()
+    sprint = sprint_manager.create_sprint("Sprint 1")
+    sprint.add_task(story)
+    sprint.add_task(feature)
+    sprint.add_task(bug)
+
+    # Changing status of a task
+    bug.change_status(TaskStatus.IN_PROGRESS)
+
+    # Print Sprint details
+    sprint_manager.print_sprint_details()
+
+    # Print delayed tasks
+    sprint_manager.print_delayed_task()
+
+    # Print tasks assigned to a user
+    sprint_manager.print_user_tasks("Bob")
@@ -25,7 +25,7 @@ class ShippingStrategy(ABC):
 
 class Free2DayShippingNonPrime(ShippingStrategy):
     def get_shipping_offer(self, order):
-        if not order.customer.is_prime and order.total > 35:
+        if not order.customer.is_prime and order.total_price > 35:
             return "Free 2-Day Shipping"
         return None
 
@@ -39,14 +39,14 @@ class Free2DayShippingPrime(ShippingStrategy):
 
 class Free1DayShipping(ShippingStrategy):
     def get_shipping_offer(self, order):
-        if order.total > 125:
+        if order.total_price > 125:
             return "Free 1-Day Shipping"
         return None
 
 
 class Free2HourGroceryPrime(ShippingStrategy):
     def get_shipping_offer(self, order):
-        if order.customer.is_prime and order.total > 25 and order.contains_groceries:
+        if order.customer.is_prime and order.total_price > 25 and order.contains_groceries:
             return "Free 2-Hour Grocery Shipping"
         return None
 